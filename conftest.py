@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Shared fixtures for the Forge MCP server tests
+
+Set FORGE_MCP_URL to run the tests against a long-running forge server's
+Streamable HTTP endpoint (started with `forge --mcp-http`) instead of
+spawning `forge --mcp`, or
+FORGE_MCP_SOCKET to connect to a warm `forge --mcp-socket` server (see
+contrib/systemd for a socket-activated setup).
+
+The test scripts are independent, so they can be spread across workers
+with pytest-xdist (`pytest -n auto`); each worker gets its own server.
+"""
+import functools
+import os
+
+import pytest
+
+from mcp_client import FORGE_BINARY, STDERR_LOG, AsyncMCPClient, MCPClient, MCPHttpClient, MCPUnixClient
+
+MCP_FIXTURES = ("mcp_client", "mcp_async_connect")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "mcp: talks to a forge MCP server")
+
+
+def pytest_collection_modifyitems(items):
+    for item in items:
+        if any(name in getattr(item, "fixturenames", ()) for name in MCP_FIXTURES):
+            item.add_marker(pytest.mark.mcp)
+
+
+def _require_binary():
+    if not os.path.exists(FORGE_BINARY):
+        pytest.skip(f"{FORGE_BINARY} not found, run `cargo build` first")
+
+
+@pytest.fixture(scope="session")
+def mcp_client():
+    """Single MCP connection shared by every test in the session (per xdist worker)"""
+    url = os.environ.get("FORGE_MCP_URL")
+    if url:
+        with MCPHttpClient.connect(url) as client:
+            yield client
+        return
+
+    socket_path = os.environ.get("FORGE_MCP_SOCKET")
+    if socket_path:
+        with MCPUnixClient.connect(socket_path) as client:
+            yield client
+        return
+
+    _require_binary()
+
+    # Workers each spawn a server, so keep their stderr logs apart
+    worker = os.environ.get("PYTEST_XDIST_WORKER")
+    stderr_log = f"mcp.stderr.{worker}.log" if worker else STDERR_LOG
+    with MCPClient.spawn(stderr_log=stderr_log) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def mcp_async_connect():
+    """Coroutine function opening an AsyncMCPClient for pipelined tests
+
+    With FORGE_MCP_SOCKET it is one more connection to the shared server.
+    Otherwise the async client spawns a private `forge --mcp`: the stdio pipes
+    of the session's server belong to `mcp_client`, and the async client has
+    no Streamable HTTP transport.
+    """
+    socket_path = os.environ.get("FORGE_MCP_SOCKET")
+    if socket_path:
+        return functools.partial(AsyncMCPClient.connect_unix, socket_path)
+
+    _require_binary()
+    return AsyncMCPClient.spawn
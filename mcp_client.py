@@ -0,0 +1,514 @@
+#!/usr/bin/env python3
+"""
+JSON-RPC clients for driving the Forge MCP server over stdio, a Unix socket or Streamable HTTP
+"""
+import abc
+import asyncio
+import contextlib
+import itertools
+import json
+import os
+import selectors
+import socket
+import subprocess
+import sys
+import threading
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import httpx
+    # httpx's HTTP/2 support, installed by the httpx[http2] extra
+    import h2
+except ImportError:
+    httpx = h2 = None
+
+FORGE_BINARY = './target/debug/forge'
+FORGE_MCP_URL = 'http://127.0.0.1:8080'
+FORGE_MCP_SOCKET = '/run/forge-mcp.sock'
+MCP_SESSION_HEADER = 'Mcp-Session-Id'
+STDERR_LOG = 'mcp.stderr.log'
+RESPONSE_TIMEOUT = 5.0
+SHUTDOWN_TIMEOUT = 0.5
+READ_CHUNK_SIZE = 64 * 1024
+WRITE_BUFFER_SIZE = 64 * 1024
+PIPE_SIZE = 1 << 20
+
+if orjson is not None:
+    dumps = orjson.dumps
+    loads = orjson.loads
+else:
+    # One compact encoder shared by every request instead of a json.dumps() call each time
+    _encode = json.JSONEncoder(separators=(",", ":")).encode
+
+    def dumps(obj):
+        return _encode(obj).encode()
+
+    def loads(data):
+        return json.loads(bytes(data) if isinstance(data, memoryview) else data)
+
+
+class RequestTemplate:
+    """Request serialized once up front, with a %d slot for its id
+
+    Fixed-shape requests can be built at import time so sending them only
+    costs a `bytes % id` substitution.
+    """
+
+    __slots__ = ('method', 'frame')
+
+    def __init__(self, method, params=None):
+        self.method = method
+        body = dumps({"method": method, "params": params if params is not None else {}})
+        self.frame = b'{"jsonrpc":"2.0","id":%d,' + body[1:].replace(b'%', b'%%')
+
+
+def _drain(stream, path, mode='wb'):
+    with stream, open(path, mode) as log:
+        for line in stream:
+            log.write(line)
+
+
+class BaseMCPClient(abc.ABC):
+    """Request id bookkeeping shared by the transport-specific clients"""
+
+    def __init__(self):
+        self._ids = itertools.count(1)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @abc.abstractmethod
+    def close(self):
+        """Close the connection to the server"""
+
+    @abc.abstractmethod
+    def restart(self):
+        """Re-establish the connection to a server that went away"""
+
+    def with_restart(self, run, attempts=2):
+        """Call run(self), restarting and retrying if the server connection breaks
+
+        Covers a server that crashed between tests (BrokenPipeError on write)
+        or mid-response (ConnectionError on read).
+        """
+        for attempt in range(1, attempts + 1):
+            try:
+                return run(self)
+            except ConnectionError:
+                if attempt == attempts:
+                    raise
+                self.restart()
+
+    def call(self, method, params=None):
+        """Send a single request (method name or RequestTemplate) and return its response"""
+        spec = method if isinstance(method, RequestTemplate) else (method, params)
+        return self.call_many([spec])[0]
+
+    def call_many(self, specs):
+        """Send requests as one JSON-RPC batch and return the responses in order
+
+        Each spec is a (method, params) pair or a RequestTemplate.
+        """
+        return list(self.iter_many(specs))
+
+    @abc.abstractmethod
+    def iter_many(self, specs):
+        """Send requests as one batch and yield each response as soon as it is available
+
+        Responses are yielded in request order. Over Streamable HTTP with SSE
+        each one arrives as its own event, so the caller can start on the first
+        while the server is still working on the rest; over stdio and the Unix
+        socket the server answers the whole batch in one line.
+        """
+
+    def _prepare(self, specs):
+        # Returns the (id, method) of each request and the serialized payload
+        requests = []
+        frames = []
+        for spec in specs:
+            template = spec if isinstance(spec, RequestTemplate) else RequestTemplate(*spec)
+            request_id = next(self._ids)
+            requests.append((request_id, template.method))
+            frames.append(template.frame % request_id)
+        payload = frames[0] if len(frames) == 1 else b'[' + b','.join(frames) + b']'
+        return requests, payload
+
+    @staticmethod
+    def _in_request_order(requests, arrivals):
+        arrivals = iter(arrivals)
+        pending = {}
+        for request_id, _ in requests:
+            while request_id not in pending:
+                response = next(arrivals, None)
+                if response is None:
+                    raise ConnectionError("MCP server stopped before answering every request")
+                pending[response.get("id")] = response
+            yield pending.pop(request_id)
+
+
+class StreamMCPClient(BaseMCPClient):
+    """Client speaking newline-delimited JSON-RPC over a reader/writer pair
+
+    Responses are read by waiting on reader readiness through a selector
+    (epoll on Linux), so a silent server raises TimeoutError instead of
+    blocking forever in readline(). Subclasses supply restart() for their
+    kind of connection.
+    """
+
+    def __init__(self, reader, writer, timeout=RESPONSE_TIMEOUT):
+        super().__init__()
+        self.timeout = timeout
+        self._attach(reader, writer)
+
+    def _attach(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+        self._buffer = bytearray()
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(reader, selectors.EVENT_READ)
+
+    def close(self):
+        self._selector.close()
+        # Unflushed requests can't be delivered if the server is already gone
+        with contextlib.suppress(BrokenPipeError):
+            self._writer.close()
+        self._reader.close()
+
+    def iter_many(self, specs):
+        requests, payload = self._prepare(specs)
+        # One buffered write and one flush per batch, however many requests it holds
+        self._writer.write(payload + b'\n')
+        self._writer.flush()
+
+        return self._in_request_order(requests, self._responses())
+
+    def _responses(self):
+        # A batch is answered with one line holding the array of its responses
+        while True:
+            response = self._read_response()
+            if isinstance(response, list):
+                yield from response
+            else:
+                yield response
+
+    def _read_response(self):
+        while True:
+            end = self._buffer.find(b'\n')
+            if end >= 0:
+                # Parse straight out of the read buffer rather than copying the line first.
+                # The line is dropped even if it isn't JSON (e.g. a stray log line),
+                # so one bad line can't fail every later read.
+                try:
+                    with memoryview(self._buffer) as view, view[:end] as line:
+                        return loads(line)
+                finally:
+                    del self._buffer[:end + 1]
+
+            if not self._selector.select(self.timeout):
+                raise TimeoutError(f"No response from MCP server within {self.timeout}s")
+            chunk = os.read(self._reader.fileno(), READ_CHUNK_SIZE)
+            if not chunk:
+                raise ConnectionError("MCP server closed the connection")
+            self._buffer += chunk
+
+
+class MCPClient(StreamMCPClient):
+    """Client bound to a running `forge --mcp` process"""
+
+    def __init__(self, process, timeout=RESPONSE_TIMEOUT, stderr_log=STDERR_LOG):
+        super().__init__(process.stdout, process.stdin, timeout)
+        self.process = process
+        self.stderr_log = stderr_log
+
+    @classmethod
+    def spawn(cls, binary=FORGE_BINARY, stderr_log=STDERR_LOG):
+        """Start a forge MCP server and return a client connected to it
+
+        The server's stderr is drained to `stderr_log` on a background thread
+        so its logging can never fill the pipe and stall the server. stdin is
+        buffered and the pipes are widened (Python 3.10+) so a whole batch
+        reaches the server in one write(2) and is never split mid-line.
+        """
+        return cls(cls._start(binary, stderr_log), stderr_log=stderr_log)
+
+    @staticmethod
+    def _start(binary, stderr_log, stderr_mode='wb'):
+        extra = {'pipesize': PIPE_SIZE} if sys.version_info >= (3, 10) else {}
+        process = subprocess.Popen(
+            [binary, '--mcp'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=False,
+            bufsize=WRITE_BUFFER_SIZE,
+            **extra
+        )
+        threading.Thread(target=_drain, args=(process.stderr, stderr_log, stderr_mode), daemon=True).start()
+        return process
+
+    def close(self):
+        """Stop the server process
+
+        Closing stdin lets the server see EOF and exit on its own; it is
+        killed if it is still running after SHUTDOWN_TIMEOUT.
+        """
+        super().close()
+        try:
+            self.process.wait(timeout=SHUTDOWN_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+    def restart(self):
+        """Replace the server process with a fresh one, e.g. after it crashed
+
+        The new server appends to the same stderr log so the crash output is kept.
+        """
+        self.close()
+        self.process = self._start(self.process.args[0], self.stderr_log, stderr_mode='ab')
+        self._attach(self.process.stdout, self.process.stdin)
+
+
+class MCPUnixClient(StreamMCPClient):
+    """Client for a long-running `forge --mcp-socket` server
+
+    The server stays warm between test runs (e.g. socket-activated by
+    systemd), so connecting skips process startup entirely. Each connection
+    gets its own MCP session state.
+    """
+
+    def __init__(self, sock, timeout=RESPONSE_TIMEOUT):
+        super().__init__(sock, sock.makefile('wb', buffering=WRITE_BUFFER_SIZE), timeout)
+        self.sock = sock
+        self.path = sock.getpeername()
+
+    @classmethod
+    def connect(cls, path=FORGE_MCP_SOCKET):
+        """Connect to the forge MCP server listening on the Unix socket at `path`"""
+        return cls(cls._open(path))
+
+    @staticmethod
+    def _open(path):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(path)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def close(self):
+        """Close the connection, leaving the server running"""
+        super().close()
+        self.sock.close()
+
+    def restart(self):
+        """Reconnect, e.g. after systemd restarted the server"""
+        self.close()
+        self.sock = self._open(self.path)
+        self._attach(self.sock, self.sock.makefile('wb', buffering=WRITE_BUFFER_SIZE))
+
+
+class MCPHttpClient(BaseMCPClient):
+    """Client for a long-running forge server's Streamable HTTP endpoint
+
+    One pooled connection is reused for every call and the session id
+    returned by the server is sent back on each request. Batches are
+    answered as an SSE stream, one event per response.
+    """
+
+    def __init__(self, http):
+        super().__init__()
+        self.http = http
+        self.session_id = None
+
+    @classmethod
+    def connect(cls, base_url=FORGE_MCP_URL):
+        """Open a persistent HTTP/2 connection to the forge MCP endpoint
+
+        The server must be started with --mcp-http.
+        """
+        if httpx is None or h2 is None:
+            raise RuntimeError("httpx with HTTP/2 support is required for the HTTP transport: pip install 'httpx[http2]'")
+        return cls(cls._open(base_url))
+
+    @staticmethod
+    def _open(base_url):
+        # httpx can't upgrade a plain http:// connection to HTTP/2 (no h2c), so
+        # speak it with prior knowledge, which actix accepts on plain TCP
+        return httpx.Client(http1=False, http2=True, base_url=base_url)
+
+    def close(self):
+        """End the session, if any, and close the pooled connection"""
+        if self.session_id:
+            # Best effort: an unreachable server has no session left to end
+            with contextlib.suppress(httpx.HTTPError):
+                self.http.delete("/mcp", headers={MCP_SESSION_HEADER: self.session_id})
+            self.session_id = None
+        self.http.close()
+
+    def restart(self):
+        """Open a fresh connection and start over without a session"""
+        base_url = self.http.base_url
+        self.http.close()
+        self.http = self._open(base_url)
+        self.session_id = None
+
+    def iter_many(self, specs):
+        requests, payload = self._prepare(specs)
+
+        headers = {
+            "Content-Type": "application/json",
+            "Accept": "application/json, text/event-stream"
+        }
+        if self.session_id:
+            headers[MCP_SESSION_HEADER] = self.session_id
+
+        http_request = self.http.build_request("POST", "/mcp", content=payload, headers=headers)
+        with self._transport_errors():
+            response = self.http.send(http_request, stream=True)
+        try:
+            response.raise_for_status()
+        except Exception:
+            response.close()
+            raise
+        self.session_id = response.headers.get(MCP_SESSION_HEADER, self.session_id)
+
+        return self._stream(requests, response)
+
+    @staticmethod
+    @contextlib.contextmanager
+    def _transport_errors():
+        # with_restart only knows the built-in ConnectionError, which httpx's
+        # ConnectError, ReadError, RemoteProtocolError etc. don't derive from
+        try:
+            yield
+        except httpx.TransportError as e:
+            raise ConnectionError(str(e)) from e
+
+    def _stream(self, requests, response):
+        with self._transport_errors():
+            yield from self._read_stream(requests, response)
+
+    def _read_stream(self, requests, response):
+        try:
+            if response.headers.get("Content-Type", "").startswith("text/event-stream"):
+                arrivals = self._events(response)
+            else:
+                body = loads(response.read())
+                arrivals = body if isinstance(body, list) else [body]
+
+            for request, message in zip(requests, self._in_request_order(requests, arrivals)):
+                _, method = request
+                # Streamed responses are sent before a new session id can go in the headers
+                if method == "session/create" and "result" in message:
+                    self.session_id = message["result"].get("session_id", self.session_id)
+                # Hand the connection back to the pool as soon as the last response is in
+                if request is requests[-1]:
+                    response.close()
+                yield message
+        finally:
+            response.close()
+
+    @staticmethod
+    def _events(response):
+        for line in response.iter_lines():
+            if line.startswith("data:"):
+                yield loads(line[5:])
+
+
+class AsyncMCPClient:
+    """asyncio client that keeps many requests in flight on one MCP connection
+
+    The connection is the stdio of a `forge --mcp` process or a Unix socket
+    to a `forge --mcp-socket` server. Each call writes its request straight
+    away and awaits a future that the reader task resolves when the response
+    with the matching id arrives, so independent calls can be pipelined with
+    asyncio.gather().
+    """
+
+    def __init__(self, reader, writer, process=None, timeout=RESPONSE_TIMEOUT):
+        self.process = process
+        self.timeout = timeout
+        self._reader = reader
+        self._writer = writer
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._read_task = asyncio.get_running_loop().create_task(self._read_responses())
+
+    @classmethod
+    async def spawn(cls, binary=FORGE_BINARY):
+        """Start a forge MCP server and return a client connected to it"""
+        process = await asyncio.create_subprocess_exec(
+            binary, '--mcp',
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            limit=1 << 20
+        )
+        return cls(process.stdout, process.stdin, process)
+
+    @classmethod
+    async def connect_unix(cls, path=FORGE_MCP_SOCKET):
+        """Connect to the forge MCP server listening on the Unix socket at `path`"""
+        reader, writer = await asyncio.open_unix_connection(path, limit=1 << 20)
+        return cls(reader, writer)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """Stop the reader task and close the connection
+
+        A spawned server process is stopped too, and killed if it ignores EOF.
+        """
+        self._read_task.cancel()
+        self._writer.close()
+        if self.process is None:
+            with contextlib.suppress(ConnectionError):
+                await self._writer.wait_closed()
+            return
+        try:
+            await asyncio.wait_for(self.process.wait(), SHUTDOWN_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.process.kill()
+            await self.process.wait()
+
+    async def call(self, method, params=None):
+        """Send a request (method name or RequestTemplate) and await its response"""
+        template = method if isinstance(method, RequestTemplate) else RequestTemplate(method, params)
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+
+        self._writer.write(template.frame % request_id + b'\n')
+        await self._writer.drain()
+        try:
+            return await asyncio.wait_for(future, self.timeout)
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def _read_responses(self):
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                response = loads(line)
+                future = self._pending.get(response.get("id"))
+                if future is not None and not future.done():
+                    future.set_result(response)
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("MCP server closed the connection"))
@@ -5,7 +5,7 @@ use dotenv::dotenv;
 use std::sync::Arc;
 use std::thread;
 use tracing::{debug, error, info, warn};
-use tracing_subscriber::{self, fmt, prelude::*, EnvFilter};
+use tracing_subscriber::{self, fmt, fmt::writer::BoxMakeWriter, prelude::*, EnvFilter};
 use tracing_appender::{self, rolling};
 
 // Import models from the models module
@@ -21,6 +21,7 @@ pub mod task_executor;
 mod task_executor_wrapper;
 mod task_queue;
 mod log_stream;
+mod mcp_handlers;
 
 mod mcp;
 use crate::block_handlers::{generate_tasks_block_handler, process_specification_handler};
@@ -42,12 +43,14 @@ use project_handlers::{
 };
 
 use crate::log_stream::{get_task_ids, stream_logs};
+use crate::mcp_handlers::{mcp_delete_handler, mcp_handler, MCPAppState};
 use crate::mcp::{server::MCPServerConfig, MCPServer};
 use crate::mcp::transport::TransportFactory;
 use crate::task_executor_wrapper::initialize as init_task_executor;
 
 // Initialize the logger with file output
-fn init_logger(mode: &str) {
+// In stdio MCP mode stdout carries the JSON-RPC stream, so console logs go to stderr
+fn init_logger(mode: &str, stdio_mcp: bool) {
     // Create a directory for logs if it doesn't exist
     std::fs::create_dir_all("logs").unwrap_or_else(|e| {
         eprintln!("Warning: Failed to create logs directory: {}", e);
@@ -64,9 +67,15 @@ fn init_logger(mode: &str) {
     }
     *APPENDER_GUARD.lock().unwrap() = Some(_guard);
 
+    let console_writer = if stdio_mcp {
+        BoxMakeWriter::new(std::io::stderr)
+    } else {
+        BoxMakeWriter::new(std::io::stdout)
+    };
+
     // Initialize the subscriber with both console and file outputs
     tracing_subscriber::registry()
-        .with(fmt::layer().with_writer(std::io::stdout))
+        .with(fmt::layer().with_writer(console_writer))
         .with(fmt::layer().with_writer(non_blocking))
         .with(EnvFilter::from_default_env().add_directive(tracing::Level::INFO.into()))
         .init();
@@ -79,24 +88,29 @@ async fn index() -> impl Responder {
     fs::NamedFile::open_async("./frontend/dist/index.html").await
 }
 
+// Working directory for MCP tool executions: the project home if set, else the current directory
+fn mcp_working_directory(project_manager: &ProjectConfigManager) -> std::path::PathBuf {
+    let project_config = project_manager.load_config().unwrap_or_default();
+    let current_dir = || std::env::current_dir().unwrap_or_else(|_| std::path::PathBuf::from("/"));
+
+    if !project_config.project_home_directory.is_empty() {
+        std::path::PathBuf::from(&project_config.project_home_directory)
+            .canonicalize()
+            .unwrap_or_else(|_| current_dir())
+    } else {
+        current_dir()
+    }
+}
+
 // Run MCP server in stdio mode
 async fn run_mcp_server(project_manager: Arc<ProjectConfigManager> , block_manager : Arc<BlockConfigManager>) -> std::io::Result<()> {
     // Initialize tracing for MCP mode
 
     info!("Starting Forge MCP Server in stdio mode...");
 
-    // Load project config to get working directory
-    let project_config = project_manager.load_config().unwrap_or_default();
-
     // Create MCP server configuration
     let mcp_config = MCPServerConfig {
-        working_directory: if !project_config.project_home_directory.is_empty() {
-            std::path::PathBuf::from(&project_config.project_home_directory)
-                .canonicalize()
-                .unwrap_or_else(|_| std::env::current_dir().unwrap_or_else(|_| std::path::PathBuf::from("/")))
-        } else {
-            std::env::current_dir().unwrap_or_else(|_| std::path::PathBuf::from("/"))
-        },
+        working_directory: mcp_working_directory(&project_manager),
         max_sessions: 5, // Lower for stdio mode
         session_timeout: std::time::Duration::from_secs(3600), // 1 hour
         max_concurrent_tools: 4,
@@ -136,11 +150,132 @@ async fn run_mcp_server(project_manager: Arc<ProjectConfigManager> , block_manag
     Ok(())
 }
 
+// Removes the socket file bound for --mcp-socket when the server stops
+#[cfg(unix)]
+struct SocketFileGuard(std::path::PathBuf);
+
+#[cfg(unix)]
+impl Drop for SocketFileGuard {
+    fn drop(&mut self) {
+        if let Err(e) = std::fs::remove_file(&self.0) {
+            warn!("Failed to remove socket {}: {}", self.0.display(), e);
+        }
+    }
+}
+
+// Listener for --mcp-socket: the socket handed over by systemd socket
+// activation (Accept=no) if there is one, otherwise `path` bound here along
+// with a guard that removes it again. A systemd socket belongs to systemd.
+#[cfg(unix)]
+fn mcp_socket_listener(path: &std::path::Path) -> std::io::Result<(tokio::net::UnixListener, Option<SocketFileGuard>)> {
+    use std::os::unix::fs::FileTypeExt;
+    use std::os::unix::io::FromRawFd;
+
+    // sd_listen_fds(3): passed sockets start at fd 3 and LISTEN_PID names the intended process
+    const SD_LISTEN_FDS_START: i32 = 3;
+    let listen_pid = std::env::var("LISTEN_PID").ok().and_then(|pid| pid.parse::<u32>().ok());
+    let listen_fds = std::env::var("LISTEN_FDS").ok().and_then(|fds| fds.parse::<u32>().ok()).unwrap_or(0);
+    if listen_pid == Some(std::process::id()) && listen_fds >= 1 {
+        info!("Using socket passed by systemd (fd {})", SD_LISTEN_FDS_START);
+        let listener = unsafe { std::os::unix::net::UnixListener::from_raw_fd(SD_LISTEN_FDS_START) };
+        listener.set_nonblocking(true)?;
+        return Ok((tokio::net::UnixListener::from_std(listener)?, None));
+    }
+
+    // Replace a socket left behind by a previous run, but never a live one
+    // or any other kind of file
+    if let Ok(metadata) = std::fs::symlink_metadata(path) {
+        if metadata.file_type().is_socket() {
+            match std::os::unix::net::UnixStream::connect(path) {
+                Ok(_) => {
+                    return Err(std::io::Error::new(
+                        std::io::ErrorKind::AddrInUse,
+                        format!("{} is in use by a running server", path.display()),
+                    ));
+                }
+                Err(e) if e.kind() == std::io::ErrorKind::ConnectionRefused => std::fs::remove_file(path)?,
+                Err(e) => return Err(e),
+            }
+        }
+    }
+    let listener = tokio::net::UnixListener::bind(path)?;
+    Ok((listener, Some(SocketFileGuard(path.to_path_buf()))))
+}
+
+// Resolves on Ctrl-C or SIGTERM (what systemd sends to stop the service)
+#[cfg(unix)]
+async fn shutdown_signal() -> std::io::Result<()> {
+    let mut sigterm = tokio::signal::unix::signal(tokio::signal::unix::SignalKind::terminate())?;
+    tokio::select! {
+        result = tokio::signal::ctrl_c() => result,
+        _ = sigterm.recv() => Ok(()),
+    }
+}
+
+// Run MCP server on a Unix domain socket, keeping one warm process for many clients
+#[cfg(unix)]
+async fn run_mcp_socket_server(socket_path: std::path::PathBuf, project_manager: Arc<ProjectConfigManager>, block_manager: Arc<BlockConfigManager>) -> std::io::Result<()> {
+    info!("Starting Forge MCP Server on unix socket {}...", socket_path.display());
+
+    let mcp_config = MCPServerConfig {
+        working_directory: mcp_working_directory(&project_manager),
+        ..Default::default()
+    };
+
+    let mcp_server = match MCPServer::new(mcp_config, project_manager, block_manager).await {
+        Ok(server) => Arc::new(server),
+        Err(e) => {
+            error!("Failed to create MCP server: {}", e);
+            return Err(std::io::Error::new(std::io::ErrorKind::Other, e));
+        }
+    };
+
+    let (listener, _socket_file) = mcp_socket_listener(&socket_path)?;
+    info!("MCP Server ready, accepting connections...");
+
+    let shutdown = shutdown_signal();
+    tokio::pin!(shutdown);
+
+    // Each connection gets the stdio protocol and its own MCP session state.
+    // Connections run on this task's thread (spawn_local), since handle_connection
+    // is driven like the stdio server and its future isn't required to be Send.
+    let connections = tokio::task::LocalSet::new();
+    connections.run_until(async {
+        let mut connection_count: u64 = 0;
+        loop {
+            let stream = tokio::select! {
+                accepted = listener.accept() => accepted?.0,
+                result = &mut shutdown => {
+                    info!("MCP Server on {} shutting down", socket_path.display());
+                    return result;
+                }
+            };
+            connection_count += 1;
+            let connection_id = format!("unix-{}", connection_count);
+            let mcp_server = mcp_server.clone();
+
+            tokio::task::spawn_local(async move {
+                let transport = match TransportFactory::create_unix(stream).await {
+                    Ok(transport) => transport,
+                    Err(e) => {
+                        error!("Failed to create unix socket transport: {}", e);
+                        return;
+                    }
+                };
+
+                if let Err(e) = mcp_server.handle_connection(transport, connection_id.clone()).await {
+                    error!("MCP Server connection error on {}: {}", connection_id, e);
+                }
+            });
+        }
+    }).await
+}
+
 
 #[tokio::main]
 async fn main() -> std::io::Result<()> {
     // Parse command line arguments
-    let matches = Command::new("forge")
+    let command = Command::new("forge")
         .version("0.1.0")
         .about("Forge - Project Management and MCP Server")
         .arg(
@@ -149,12 +284,26 @@ async fn main() -> std::io::Result<()> {
                 .help("Run in MCP server mode (stdio transport)")
                 .action(clap::ArgAction::SetTrue)
         )
-        .get_matches();
+        .arg(
+            Arg::new("mcp-http")
+                .long("mcp-http")
+                .help("Also serve MCP over Streamable HTTP at /mcp (off by default: it exposes file tools)")
+                .action(clap::ArgAction::SetTrue)
+        );
+    // Unix domain sockets only exist on unix, so the option isn't offered elsewhere
+    #[cfg(unix)]
+    let command = command.arg(
+        Arg::new("mcp-socket")
+            .long("mcp-socket")
+            .value_name("PATH")
+            .help("Run in MCP server mode on a Unix domain socket (or the socket passed by systemd)")
+    );
+    let matches = command.get_matches();
 
     // Load environment variables from .env file
     dotenv().ok();
 
-    init_logger("mcp");
+    init_logger("mcp", matches.get_flag("mcp"));
 
     // Get the singleton instance of ProjectConfigManager
     let project_manager = ProjectConfigManager::get_instance();
@@ -242,18 +391,52 @@ async fn main() -> std::io::Result<()> {
         block_manager: block_manager.clone(),
     });
 
+    // Long-running MCP server on a Unix domain socket
+    #[cfg(unix)]
+    if let Some(socket_path) = matches.get_one::<String>("mcp-socket") {
+        return run_mcp_socket_server(
+            std::path::PathBuf::from(socket_path),
+            project_manager,
+            block_manager).await;
+    }
+
     // Create a thread for the MCP server if the flag is set
     if matches.get_flag("mcp") {
         run_mcp_server(
             project_manager,
             block_manager).await
     } else {
+        // MCP server exposed over Streamable HTTP alongside the REST API, only on request
+        let mcp_app_state = if matches.get_flag("mcp-http") {
+            let mcp_config = MCPServerConfig {
+                working_directory: mcp_working_directory(&project_manager),
+                ..Default::default()
+            };
+            // An MCP setup problem must not keep the web UI from starting
+            match MCPServer::new(mcp_config, project_manager.clone(), block_manager.clone()).await {
+                Ok(mcp_server) => {
+                    // No connection teardown ends HTTP sessions, so let the cleanup service expire them
+                    mcp_server.start_services().await;
+                    Some(web::Data::new(MCPAppState {
+                        mcp_server: Arc::new(mcp_server),
+                    }))
+                }
+                Err(e) => {
+                    error!("Failed to create MCP server, /mcp will not be available: {}", e);
+                    None
+                }
+            }
+        } else {
+            None
+        };
+
         // Run the HTTP server in the main thread
         info!("Starting HTTP server on 127.0.0.1:8080");
        run_http_server(
             app_state,
             project_app_state,
             git_app_state,
+            mcp_app_state,
         ).await
     }
 }
@@ -261,7 +444,8 @@ async fn main() -> std::io::Result<()> {
 async fn run_http_server(
     app_state: web::Data<AppState>,
     project_app_state: web::Data<ProjectAppState>,
-    git_app_state: web::Data<GitAppState>
+    git_app_state: web::Data<GitAppState>,
+    mcp_app_state: Option<web::Data<MCPAppState>>
 ) -> std::io::Result<()> {
     HttpServer::new(move || {
         App::new()
@@ -307,6 +491,15 @@ async fn run_http_server(
                     .route("/logs/tasks", web::get().to(get_task_ids))
             )
 
+            // MCP Streamable HTTP endpoint (--mcp-http)
+            .configure(|cfg| {
+                if let Some(mcp_app_state) = &mcp_app_state {
+                    cfg.app_data(mcp_app_state.clone())
+                        .route("/mcp", web::post().to(mcp_handler))
+                        .route("/mcp", web::delete().to(mcp_delete_handler));
+                }
+            })
+
             // Serve static files from the frontend/dist directory
             .service(fs::Files::new("/assets", "./frontend/dist/assets"))
 
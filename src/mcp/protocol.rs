@@ -1,4 +1,4 @@
-use crate::mcp::errors::{JsonRpcError, MCPError, MCPResult, ProtocolError};
+use crate::mcp::errors::{JsonRpcError, JsonRpcErrorCode, MCPError, MCPResult, ProtocolError};
 use serde::{Deserialize, Serialize};
 use serde_json::Value;
 use uuid::Uuid;
@@ -341,6 +341,15 @@ pub struct InitializeResult {
     pub instructions: Option<String>,
 }
 
+/// A decoded JSON-RPC payload: one message, or a batch checked element by element
+#[derive(Debug)]
+pub struct MessageBatch {
+    /// Whether the payload was a JSON array, in which case the responses go back as one array
+    pub is_batch: bool,
+    /// Each element in order; an invalid one carries the error response to send for it
+    pub messages: Vec<Result<MCPMessage, MCPMessage>>,
+}
+
 /// Protocol message parser
 pub struct MessageParser;
 
@@ -354,6 +363,61 @@ impl MessageParser {
         Ok(message)
     }
 
+    /// Parse a single message or a JSON-RPC batch array from JSON bytes
+    ///
+    /// Only unreadable JSON or an empty batch fails the whole payload. An invalid
+    /// element is answered with its own Invalid Request error, as JSON-RPC 2.0 requires.
+    pub fn parse_batch(data: &[u8]) -> MCPResult<MessageBatch> {
+        let payload: Value = serde_json::from_slice(data)
+            .map_err(|e| MCPError::Protocol(ProtocolError::ParseError(e.to_string())))?;
+
+        match payload {
+            Value::Array(elements) => {
+                if elements.is_empty() {
+                    return Err(MCPError::Protocol(ProtocolError::InvalidMessage(
+                        "Batch must contain at least one message".to_string()
+                    )));
+                }
+
+                Ok(MessageBatch {
+                    is_batch: true,
+                    messages: elements.into_iter().map(Self::parse_element).collect(),
+                })
+            }
+            element => Ok(MessageBatch {
+                is_batch: false,
+                messages: vec![Self::parse_element(element)],
+            }),
+        }
+    }
+
+    /// Parse one payload element, or build the Invalid Request response for it
+    fn parse_element(element: Value) -> Result<MCPMessage, MCPMessage> {
+        let id = element.get("id").cloned().unwrap_or(Value::Null);
+
+        serde_json::from_value::<MCPMessage>(element)
+            .map_err(|e| e.to_string())
+            .and_then(|message| message.validate().map(|_| message).map_err(|e| e.to_string()))
+            .map_err(|e| MCPMessage::error_response(id, JsonRpcError::new(JsonRpcErrorCode::InvalidRequest, e)))
+    }
+
+    /// Build the response to a payload that could not be parsed at all (its id is unknown)
+    pub fn payload_error_response(error: &MCPError) -> MCPMessage {
+        let code = match error {
+            MCPError::Protocol(ProtocolError::ParseError(_)) => JsonRpcErrorCode::ParseError,
+            _ => JsonRpcErrorCode::InvalidRequest,
+        };
+        MCPMessage::error_response(Value::Null, JsonRpcError::new(code, error.to_string()))
+    }
+
+    /// Build the response sent in place of one that failed to serialize, so its id is still answered
+    pub fn serialization_error_response(message: &MCPMessage, error: &MCPError) -> MCPMessage {
+        MCPMessage::error_response(
+            message.id.clone().unwrap_or(Value::Null),
+            JsonRpcError::new(JsonRpcErrorCode::InternalError, format!("Failed to serialize response: {}", error)),
+        )
+    }
+
     /// Serialize a message to JSON bytes
     pub fn serialize_message(message: &MCPMessage) -> MCPResult<Vec<u8>> {
         message.validate()?;
@@ -361,6 +425,15 @@ impl MessageParser {
             .map_err(|e| MCPError::Protocol(ProtocolError::InternalError(e.to_string())))
     }
 
+    /// Serialize the responses to a batch as one JSON array
+    pub fn serialize_batch(messages: &[MCPMessage]) -> MCPResult<Vec<u8>> {
+        for message in messages {
+            message.validate()?;
+        }
+        serde_json::to_vec(messages)
+            .map_err(|e| MCPError::Protocol(ProtocolError::InternalError(e.to_string())))
+    }
+
     /// Parse multiple messages from a buffer (for stream parsing)
     pub fn parse_messages(buffer: &str) -> Vec<MCPResult<MCPMessage>> {
         let mut results = Vec::new();
@@ -429,4 +502,39 @@ mod tests {
         assert!(message.is_request());
         assert_eq!(message.method.unwrap(), "test");
     }
-}
\ No newline at end of file
+
+    #[test]
+    fn test_batch_parsing() {
+        let json_data = r#"[{"jsonrpc":"2.0","id":1,"method":"initialize"},{"jsonrpc":"2.0","id":2,"method":"tools/list"}]"#;
+        let batch = MessageParser::parse_batch(json_data.as_bytes()).unwrap();
+        assert!(batch.is_batch);
+        assert_eq!(batch.messages.len(), 2);
+        assert_eq!(batch.messages[1].as_ref().unwrap().method.as_deref(), Some("tools/list"));
+
+        let single = MessageParser::parse_batch(br#"{"jsonrpc":"2.0","id":1,"method":"test"}"#).unwrap();
+        assert!(!single.is_batch);
+        assert_eq!(single.messages.len(), 1);
+
+        assert!(MessageParser::parse_batch(b"[]").is_err());
+        assert!(MessageParser::parse_batch(b"[{").is_err());
+    }
+
+    #[test]
+    fn test_batch_with_invalid_element() {
+        let json_data = r#"[{"jsonrpc":"2.0","id":1,"method":"initialize"},{"jsonrpc":"1.0","id":2,"method":"x"},3]"#;
+        let batch = MessageParser::parse_batch(json_data.as_bytes()).unwrap();
+        assert_eq!(batch.messages.len(), 3);
+        assert!(batch.messages[0].is_ok());
+
+        let invalid = batch.messages[1].as_ref().unwrap_err();
+        assert_eq!(invalid.id, Some(json!(2)));
+        assert_eq!(invalid.error.as_ref().unwrap().code, JsonRpcErrorCode::InvalidRequest as i32);
+
+        let not_an_object = batch.messages[2].as_ref().unwrap_err();
+        assert_eq!(not_an_object.id, Some(Value::Null));
+
+        let serialized = MessageParser::serialize_batch(&[invalid.clone(), not_an_object.clone()]).unwrap();
+        let responses: Vec<Value> = serde_json::from_slice(&serialized).unwrap();
+        assert_eq!(responses.len(), 2);
+    }
+}
@@ -20,7 +20,7 @@ use crate::mcp::{
     errors::{MCPError, MCPResult, ServerError},
     protocol::{
         ClientCapabilities, InitializeParams, InitializeResult, MCPMessage, MCPRequest,
-        MCPResponse, ServerCapabilities, ServerInfo, ToolsCapability,
+        MCPResponse, MessageBatch, MessageParser, ServerCapabilities, ServerInfo, ToolsCapability,
     },
     session::{ClientInfo, SessionCleanupService, SessionId, SessionManager},
     state::{StateConfig, UnifiedStateManager},
@@ -211,6 +211,22 @@ impl MCPServer {
         let (shutdown_tx, mut shutdown_rx) = mpsc::channel(1);
         self.shutdown_tx = Some(shutdown_tx);
 
+        self.start_services().await;
+
+        info!("MCP Server started successfully");
+
+        // Wait for shutdown signal
+        let _ = shutdown_rx.recv().await;
+
+        info!("MCP Server shutting down...");
+        Ok(())
+    }
+
+    /// Start the background cleanup and monitoring services
+    ///
+    /// For servers driven by request handlers rather than `start`, e.g. Streamable
+    /// HTTP, where sessions have no connection whose teardown would end them.
+    pub async fn start_services(&self) {
         // Start cleanup services
         if self.config.enable_cleanup {
             self.start_cleanup_services().await;
@@ -223,14 +239,11 @@ impl MCPServer {
 
         // Start context cleanup
         self.context_manager.start_cleanup_service().await;
+    }
 
-        info!("MCP Server started successfully");
-
-        // Wait for shutdown signal
-        let _ = shutdown_rx.recv().await;
-
-        info!("MCP Server shutting down...");
-        Ok(())
+    /// End a session on behalf of a client, e.g. a Streamable HTTP DELETE
+    pub async fn terminate_session(&self, session_id: &str) -> MCPResult<()> {
+        self.session_manager.terminate_session(session_id).await
     }
 
     /// Handle a new connection
@@ -253,9 +266,9 @@ impl MCPServer {
 
         // Main message loop
         loop {
-            match transport.receive().await {
-                Ok(message) => {
-                    if let Err(e) = self.handle_message(message, &mut transport, &connection_id, &mut session_id).await {
+            match transport.receive_batch().await {
+                Ok(batch) => {
+                    if let Err(e) = self.handle_batch(batch, &mut transport, &connection_id, &mut session_id).await {
                         error!("Error handling message: {}", e);
 
                         // Update error stats
@@ -291,35 +304,95 @@ impl MCPServer {
         Ok(())
     }
 
-    /// Handle a single message
-    async fn handle_message(
+    /// Handle one payload received on a connection
+    ///
+    /// A batch is answered with a single batch of responses, as JSON-RPC 2.0 requires.
+    async fn handle_batch(
         &self,
-        message: MCPMessage,
+        batch: MessageBatch,
         transport: &mut Box<dyn MCPTransport>,
         connection_id: &str,
         session_id: &mut Option<SessionId>,
     ) -> MCPResult<()> {
+        // Update connection activity
+        self.update_connection_activity(connection_id).await;
+
+        let responses = self.dispatch_batch(batch.messages, session_id).await?;
+        if batch.is_batch {
+            if !responses.is_empty() {
+                transport.send_batch(responses).await?;
+            }
+        } else {
+            for response in responses {
+                transport.send(response).await?;
+            }
+        }
+
+        Ok(())
+    }
+
+    /// Handle a JSON-RPC message or batch received over Streamable HTTP
+    ///
+    /// Returns the responses in request order; notifications produce none.
+    pub async fn handle_http_message(
+        &self,
+        body: &[u8],
+        session_id: &mut Option<SessionId>,
+    ) -> MCPResult<Vec<MCPMessage>> {
+        let batch = MessageParser::parse_batch(body)?;
+        self.dispatch_batch(batch.messages, session_id).await
+    }
+
+    /// Dispatch the elements of a payload in order, returning their responses
+    ///
+    /// Invalid elements are answered with the error response built for them.
+    pub async fn dispatch_batch(
+        &self,
+        messages: Vec<Result<MCPMessage, MCPMessage>>,
+        session_id: &mut Option<SessionId>,
+    ) -> MCPResult<Vec<MCPMessage>> {
+        let mut responses = Vec::with_capacity(messages.len());
+        for message in messages {
+            match message {
+                Ok(message) => {
+                    if let Some(response) = self.dispatch_message(message, session_id).await? {
+                        responses.push(response);
+                    }
+                }
+                Err(error_response) => responses.push(error_response),
+            }
+        }
+
+        Ok(responses)
+    }
+
+    /// Dispatch one message, returning its response if any
+    pub async fn dispatch_message(
+        &self,
+        message: MCPMessage,
+        session_id: &mut Option<SessionId>,
+    ) -> MCPResult<Option<MCPMessage>> {
         // Update message stats
         {
             let mut stats = self.stats.lock().await;
             stats.total_messages += 1;
         }
 
-        // Update connection activity
-        self.update_connection_activity(connection_id).await;
-
         if message.is_request() {
-            let request = message.as_request()?;
-            let response = self.handle_request(request, session_id).await;
-            transport.send(response).await?;
+            // Every request gets an answer, so a bad one can't leave its id pending
+            let id = message.id.clone().unwrap_or(Value::Null);
+            match message.as_request() {
+                Ok(request) => Ok(Some(self.handle_request(request, session_id).await)),
+                Err(e) => Ok(Some(MCPMessage::error_response(id, e.into()))),
+            }
         } else if message.is_notification() {
             let notification = message.as_notification()?;
             self.handle_notification(notification, session_id).await?;
+            Ok(None)
         } else {
             warn!("Received unexpected message type");
+            Ok(None)
         }
-
-        Ok(())
     }
 
     /// Handle a request message
@@ -474,6 +547,15 @@ impl MCPServer {
             }
         };
 
+        // A connection holds one session at a time: end the one being replaced so
+        // repeated session/create calls on a long-lived connection don't pile up
+        // against max_sessions
+        if let Some(previous_session_id) = session_id.take() {
+            if let Err(e) = self.session_manager.terminate_session(&previous_session_id).await {
+                warn!("Failed to terminate replaced session {}: {}", previous_session_id, e);
+            }
+        }
+
         let new_session_id = self.session_manager.create_session(client_info).await?;
         *session_id = Some(new_session_id.clone());
 
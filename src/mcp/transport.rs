@@ -1,16 +1,21 @@
 use async_trait::async_trait;
 use futures_util::{SinkExt, StreamExt};
 use serde_json::Value;
+use std::collections::VecDeque;
 use std::sync::Arc;
+use tokio::io::{AsyncRead, AsyncWrite};
 use tokio::sync::{mpsc, RwLock};
 use tokio_tungstenite::{accept_async, tungstenite::Message as WsMessage};
 use tracing::{debug, error, info, warn};
 
 use crate::mcp::{
     errors::{MCPError, MCPResult, TransportError},
-    protocol::{MCPMessage, MessageParser},
+    protocol::{MCPMessage, MessageBatch, MessageParser},
 };
 
+/// Buffer size for the stdio transport's reader and writer
+const STDIO_BUFFER_SIZE: usize = 64 * 1024;
+
 /// Transport types supported by the MCP server
 #[derive(Debug, Clone, Copy, PartialEq)]
 pub enum TransportType {
@@ -28,6 +33,24 @@ pub trait MCPTransport: Send + Sync {
     /// Receive a message from the transport
     async fn receive(&mut self) -> MCPResult<MCPMessage>;
 
+    /// Receive the next payload, which may be a JSON-RPC batch
+    ///
+    /// Transports without batch support deliver one message at a time.
+    async fn receive_batch(&mut self) -> MCPResult<MessageBatch> {
+        let message = self.receive().await?;
+        Ok(MessageBatch { is_batch: false, messages: vec![Ok(message)] })
+    }
+
+    /// Send the responses to a batch as a single payload
+    ///
+    /// Transports without batch support send them one at a time.
+    async fn send_batch(&mut self, messages: Vec<MCPMessage>) -> MCPResult<()> {
+        for message in messages {
+            self.send(message).await?;
+        }
+        Ok(())
+    }
+
     /// Close the transport connection
     async fn close(&mut self) -> MCPResult<()>;
 
@@ -260,52 +283,96 @@ impl MCPTransport for HttpTransport {
     }
 }
 
+/// One line written by the stdio transport
+enum StdioFrame {
+    Message(MCPMessage),
+    Batch(Vec<MCPMessage>),
+}
+
+impl StdioFrame {
+    /// Serialize the frame, answering any response that can't be serialized
+    /// with an InternalError for its id rather than dropping the whole line
+    fn serialize(&self) -> MCPResult<Vec<u8>> {
+        match self {
+            StdioFrame::Message(message) => MessageParser::serialize_message(message).or_else(|e| {
+                error!("Failed to serialize message: {}", e);
+                MessageParser::serialize_message(&MessageParser::serialization_error_response(message, &e))
+            }),
+            StdioFrame::Batch(messages) => MessageParser::serialize_batch(messages).or_else(|e| {
+                error!("Failed to serialize batch: {}", e);
+                // Replace only the responses that fail, so the rest of the batch still goes out
+                let messages: Vec<MCPMessage> = messages
+                    .iter()
+                    .map(|message| match MessageParser::serialize_message(message) {
+                        Ok(_) => message.clone(),
+                        Err(e) => MessageParser::serialization_error_response(message, &e),
+                    })
+                    .collect();
+                MessageParser::serialize_batch(&messages)
+            }),
+        }
+    }
+}
+
 /// Stdio transport implementation
+///
+/// Speaks newline-delimited JSON-RPC: each line is one message or one batch,
+/// and a batch is answered with a single line holding the array of responses.
 pub struct StdioTransport {
-    sender: mpsc::UnboundedSender<MCPMessage>,
-    receiver: mpsc::UnboundedReceiver<MCPMessage>,
+    sender: mpsc::UnboundedSender<StdioFrame>,
+    receiver: mpsc::UnboundedReceiver<MessageBatch>,
+    /// Messages of a batch not yet handed out by `receive`
+    backlog: VecDeque<MCPMessage>,
     is_connected: Arc<RwLock<bool>>,
 }
 
 impl StdioTransport {
     pub async fn new() -> MCPResult<Self> {
+        Self::from_streams(tokio::io::stdin(), tokio::io::stdout()).await
+    }
+
+    /// Serve newline-delimited JSON-RPC over any reader/writer pair, e.g. the
+    /// two halves of a Unix domain socket
+    pub async fn from_streams<R, W>(reader: R, writer: W) -> MCPResult<Self>
+    where
+        R: AsyncRead + Unpin + Send + 'static,
+        W: AsyncWrite + Unpin + Send + 'static,
+    {
         let (msg_sender, msg_receiver) = mpsc::unbounded_channel();
-        let (response_sender, response_receiver) = mpsc::unbounded_channel();
+        let (response_sender, response_receiver) = mpsc::unbounded_channel::<StdioFrame>();
         let is_connected = Arc::new(RwLock::new(true));
 
         // Spawn task to handle stdout output
         let is_connected_clone = is_connected.clone();
         tokio::spawn(async move {
+            use tokio::io::{AsyncWriteExt, BufWriter};
+
             let mut response_receiver = response_receiver;
-            while let Some(message) = response_receiver.recv().await {
-                let json_data = match MessageParser::serialize_message(&message) {
-                    Ok(data) => data,
-                    Err(e) => {
-                        error!("Failed to serialize message: {}", e);
-                        continue;
+            let mut stdout = BufWriter::with_capacity(STDIO_BUFFER_SIZE, writer);
+
+            'output: while let Some(frame) = response_receiver.recv().await {
+                // Coalesce every frame already queued into the buffer so a burst
+                // costs one write and one flush.
+                let mut next = Some(frame);
+                while let Some(frame) = next {
+                    match frame.serialize() {
+                        Ok(mut json_data) => {
+                            // Newline delimiter goes out in the same write as the message
+                            json_data.push(b'\n');
+                            if let Err(e) = stdout.write_all(&json_data).await {
+                                error!("Failed to write to stdout: {}", e);
+                                *is_connected_clone.write().await = false;
+                                break 'output;
+                            }
+                        }
+                        Err(e) => {
+                            error!("Failed to serialize message: {}", e);
+                        }
                     }
-                };
-
-                // Write to stdout with newline delimiter
-                if let Err(e) = tokio::io::AsyncWriteExt::write_all(
-                    &mut tokio::io::stdout(),
-                    &json_data,
-                ).await {
-                    error!("Failed to write to stdout: {}", e);
-                    *is_connected_clone.write().await = false;
-                    break;
+                    next = response_receiver.try_recv().ok();
                 }
 
-                if let Err(e) = tokio::io::AsyncWriteExt::write_all(
-                    &mut tokio::io::stdout(),
-                    b"\n",
-                ).await {
-                    error!("Failed to write newline to stdout: {}", e);
-                    *is_connected_clone.write().await = false;
-                    break;
-                }
-
-                if let Err(e) = tokio::io::AsyncWriteExt::flush(&mut tokio::io::stdout()).await {
+                if let Err(e) = stdout.flush().await {
                     error!("Failed to flush stdout: {}", e);
                     *is_connected_clone.write().await = false;
                     break;
@@ -315,12 +382,12 @@ impl StdioTransport {
 
         // Spawn task to handle stdin input
         let msg_sender_clone = msg_sender.clone();
+        let error_sender = response_sender.clone();
         let is_connected_clone = is_connected.clone();
         tokio::spawn(async move {
             use tokio::io::{AsyncBufReadExt, BufReader};
 
-            let stdin = tokio::io::stdin();
-            let reader = BufReader::new(stdin);
+            let reader = BufReader::with_capacity(STDIO_BUFFER_SIZE, reader);
             let mut lines = reader.lines();
 
             while let Ok(Some(line)) = lines.next_line().await {
@@ -328,15 +395,17 @@ impl StdioTransport {
                     continue;
                 }
 
-                match MessageParser::parse_message(line.as_bytes()) {
-                    Ok(mcp_message) => {
-                        if let Err(_) = msg_sender_clone.send(mcp_message) {
+                match MessageParser::parse_batch(line.as_bytes()) {
+                    Ok(batch) => {
+                        if msg_sender_clone.send(batch).is_err() {
                             warn!("Receiver dropped, closing stdio connection");
                             break;
                         }
                     }
                     Err(e) => {
+                        // The payload's ids are unknown, so answer with a single null-id error
                         error!("Failed to parse MCP message from stdin: {}", e);
+                        let _ = error_sender.send(StdioFrame::Message(MessageParser::payload_error_response(&e)));
                     }
                 }
             }
@@ -347,14 +416,12 @@ impl StdioTransport {
         Ok(Self {
             sender: response_sender,
             receiver: msg_receiver,
+            backlog: VecDeque::new(),
             is_connected,
         })
     }
-}
 
-#[async_trait]
-impl MCPTransport for StdioTransport {
-    async fn send(&mut self, message: MCPMessage) -> MCPResult<()> {
+    fn send_frame(&self, frame: StdioFrame) -> MCPResult<()> {
         if !self.is_connected() {
             return Err(MCPError::Transport(TransportError::ConnectionLost(
                 "Stdio connection is closed".to_string()
@@ -362,13 +429,33 @@ impl MCPTransport for StdioTransport {
         }
 
         self.sender
-            .send(message)
+            .send(frame)
             .map_err(|_| MCPError::Transport(TransportError::ConnectionLost(
                 "Stdio sender channel closed".to_string()
             )))
     }
+}
+
+#[async_trait]
+impl MCPTransport for StdioTransport {
+    async fn send(&mut self, message: MCPMessage) -> MCPResult<()> {
+        self.send_frame(StdioFrame::Message(message))
+    }
 
     async fn receive(&mut self) -> MCPResult<MCPMessage> {
+        // Hands out batch elements one by one; invalid elements are dropped here,
+        // so callers that need to answer them should use receive_batch
+        loop {
+            if let Some(message) = self.backlog.pop_front() {
+                return Ok(message);
+            }
+
+            let batch = self.receive_batch().await?;
+            self.backlog.extend(batch.messages.into_iter().filter_map(Result::ok));
+        }
+    }
+
+    async fn receive_batch(&mut self) -> MCPResult<MessageBatch> {
         self.receiver
             .recv()
             .await
@@ -377,6 +464,10 @@ impl MCPTransport for StdioTransport {
             )))
     }
 
+    async fn send_batch(&mut self, messages: Vec<MCPMessage>) -> MCPResult<()> {
+        self.send_frame(StdioFrame::Batch(messages))
+    }
+
     async fn close(&mut self) -> MCPResult<()> {
         *self.is_connected.write().await = false;
         Ok(())
@@ -412,11 +503,20 @@ impl TransportFactory {
         let transport = StdioTransport::new().await?;
         Ok(Box::new(transport))
     }
+
+    /// Create a transport speaking the stdio protocol over a Unix domain socket connection
+    #[cfg(unix)]
+    pub async fn create_unix(stream: tokio::net::UnixStream) -> MCPResult<Box<dyn MCPTransport>> {
+        let (reader, writer) = stream.into_split();
+        let transport = StdioTransport::from_streams(reader, writer).await?;
+        Ok(Box::new(transport))
+    }
 }
 
 #[cfg(test)]
 mod tests {
     use super::*;
+    use crate::mcp::errors::JsonRpcErrorCode;
     use serde_json::json;
 
     #[test]
@@ -441,6 +541,86 @@ mod tests {
         assert!(response.is_response());
     }
 
+    #[tokio::test]
+    async fn test_stream_transport_round_trip() {
+        use tokio::io::{AsyncBufReadExt, AsyncWriteExt, BufReader};
+
+        let (client, server) = tokio::io::duplex(1024);
+        let (server_reader, server_writer) = tokio::io::split(server);
+        let mut transport = StdioTransport::from_streams(server_reader, server_writer).await.unwrap();
+
+        let (client_reader, mut client_writer) = tokio::io::split(client);
+        let mut request = MessageParser::serialize_message(&MCPMessage::request("ping", None)).unwrap();
+        request.push(b'\n');
+        client_writer.write_all(&request).await.unwrap();
+
+        let received = transport.receive().await.unwrap();
+        assert_eq!(received.method.as_deref(), Some("ping"));
+
+        let id = received.id.clone().unwrap();
+        transport.send(MCPMessage::response(id.clone(), Some(json!({})))).await.unwrap();
+
+        let mut line = String::new();
+        BufReader::new(client_reader).read_line(&mut line).await.unwrap();
+        let response = MessageParser::parse_message(line.trim_end().as_bytes()).unwrap();
+        assert!(response.is_response());
+        assert_eq!(response.id, Some(id));
+    }
+
+    #[tokio::test]
+    async fn test_stream_transport_batch() {
+        use tokio::io::{AsyncBufReadExt, AsyncWriteExt, BufReader};
+
+        let (client, server) = tokio::io::duplex(1024);
+        let (server_reader, server_writer) = tokio::io::split(server);
+        let mut transport = StdioTransport::from_streams(server_reader, server_writer).await.unwrap();
+
+        let (client_reader, mut client_writer) = tokio::io::split(client);
+        client_writer
+            .write_all(b"[{\"jsonrpc\":\"2.0\",\"id\":1,\"method\":\"ping\"},{\"jsonrpc\":\"2.0\",\"id\":2}]\n")
+            .await
+            .unwrap();
+
+        let batch = transport.receive_batch().await.unwrap();
+        assert!(batch.is_batch);
+        let responses: Vec<MCPMessage> = batch.messages.into_iter()
+            .map(|message| message.map(|m| MCPMessage::response(m.id.unwrap(), Some(json!({})))).unwrap_or_else(|e| e))
+            .collect();
+        transport.send_batch(responses).await.unwrap();
+
+        // Both answers come back on one line, as a JSON array
+        let mut line = String::new();
+        BufReader::new(client_reader).read_line(&mut line).await.unwrap();
+        let responses: Vec<Value> = serde_json::from_str(line.trim_end()).unwrap();
+        assert_eq!(responses.len(), 2);
+        assert_eq!(responses[0]["id"], json!(1));
+        assert_eq!(responses[1]["id"], json!(2));
+        assert!(responses[1]["error"].is_object());
+    }
+
+    #[tokio::test]
+    async fn test_stream_transport_batch_with_unserializable_response() {
+        use tokio::io::{AsyncBufReadExt, BufReader};
+
+        let (client, server) = tokio::io::duplex(1024);
+        let (server_reader, server_writer) = tokio::io::split(server);
+        let mut transport = StdioTransport::from_streams(server_reader, server_writer).await.unwrap();
+
+        // A response with neither result nor error fails validation
+        let invalid = MCPMessage::response(json!(2), None);
+        transport.send_batch(vec![MCPMessage::response(json!(1), Some(json!({}))), invalid]).await.unwrap();
+
+        // The line still goes out, with only the bad response replaced by an error for its id
+        let (client_reader, _client_writer) = tokio::io::split(client);
+        let mut line = String::new();
+        BufReader::new(client_reader).read_line(&mut line).await.unwrap();
+        let responses: Vec<Value> = serde_json::from_str(line.trim_end()).unwrap();
+        assert_eq!(responses.len(), 2);
+        assert_eq!(responses[0]["result"], json!({}));
+        assert_eq!(responses[1]["id"], json!(2));
+        assert_eq!(responses[1]["error"]["code"], json!(JsonRpcErrorCode::InternalError as i32));
+    }
+
     #[tokio::test]
     async fn test_message_serialization() {
         let message = MCPMessage::request("test", Some(json!({"key": "value"})));
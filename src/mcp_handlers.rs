@@ -0,0 +1,202 @@
+use crate::mcp::errors::MCPError;
+use crate::mcp::protocol::{MCPMessage, MessageParser};
+use crate::mcp::MCPServer;
+use actix_web::http::header::{ACCEPT, CACHE_CONTROL, CONTENT_TYPE, ORIGIN};
+use actix_web::web::Bytes;
+use actix_web::{web, HttpRequest, HttpResponse, Responder};
+use futures::stream::StreamExt;
+use std::sync::Arc;
+use tokio::sync::mpsc;
+use tokio_stream::wrappers::ReceiverStream;
+use tracing::{error, warn};
+
+// Header carrying the MCP session id between Streamable HTTP requests
+pub const MCP_SESSION_HEADER: &str = "Mcp-Session-Id";
+
+// Origins allowed to call the MCP endpoint: pages served by forge itself
+const ALLOWED_ORIGINS: &[&str] = &["http://127.0.0.1:8080", "http://localhost:8080"];
+
+// AppState for the MCP Streamable HTTP endpoint
+pub struct MCPAppState {
+    pub mcp_server: Arc<MCPServer>,
+}
+
+// Build the JSON-RPC error returned for request bodies that can't be parsed at all
+fn parse_error_response(error: &MCPError) -> HttpResponse {
+    HttpResponse::BadRequest().json(MessageParser::payload_error_response(error))
+}
+
+// Reject requests that a page on another site could have sent. The endpoint can
+// write and delete files, so a foreign Origin is refused (as the MCP Streamable
+// HTTP spec requires). Browsers always send Origin on cross-site requests, while
+// non-browser MCP clients usually don't, so a missing Origin is let through and
+// the JSON-only Content-Type check (a cross-site form or "simple" fetch cannot
+// send application/json without a CORS preflight) guards against CSRF instead.
+fn check_request_origin(req: &HttpRequest) -> Result<(), HttpResponse> {
+    match req.headers().get(ORIGIN) {
+        None => Ok(()),
+        Some(origin) if origin.to_str().map_or(false, |origin| ALLOWED_ORIGINS.contains(&origin)) => Ok(()),
+        Some(origin) => {
+            warn!("Rejected MCP request from origin {:?}", origin);
+            Err(HttpResponse::Forbidden().body("Origin not allowed"))
+        }
+    }
+}
+
+fn check_json_content_type(req: &HttpRequest) -> Result<(), HttpResponse> {
+    let is_json = req
+        .headers()
+        .get(CONTENT_TYPE)
+        .and_then(|value| value.to_str().ok())
+        .and_then(|value| value.split(';').next())
+        .map_or(false, |mime| mime.trim().eq_ignore_ascii_case("application/json"));
+
+    if is_json {
+        Ok(())
+    } else {
+        Err(HttpResponse::UnsupportedMediaType().body("Content-Type must be application/json"))
+    }
+}
+
+// Send one response as an SSE event; false once the client has gone away
+async fn send_event(tx: &mpsc::Sender<String>, message: &MCPMessage) -> bool {
+    let json_data = match MessageParser::serialize_message(message) {
+        Ok(data) => data,
+        Err(e) => {
+            error!("Failed to serialize message: {}", e);
+            // The client still gets an answer for this id
+            match MessageParser::serialize_message(&MessageParser::serialization_error_response(message, &e)) {
+                Ok(data) => data,
+                Err(_) => return true,
+            }
+        }
+    };
+
+    let event = format!("event: message\ndata: {}\n\n", String::from_utf8_lossy(&json_data));
+    tx.send(event).await.is_ok()
+}
+
+// Handler for JSON-RPC messages and batches posted to the MCP endpoint
+pub async fn mcp_handler(
+    req: HttpRequest,
+    body: web::Bytes,
+    data: web::Data<MCPAppState>,
+) -> impl Responder {
+    if let Err(response) = check_request_origin(&req).and_then(|_| check_json_content_type(&req)) {
+        return response;
+    }
+
+    let mut session_id = req
+        .headers()
+        .get(MCP_SESSION_HEADER)
+        .and_then(|value| value.to_str().ok())
+        .map(str::to_string);
+    let is_batch = body.iter().find(|b| !b.is_ascii_whitespace()) == Some(&b'[');
+    let accepts_sse = req
+        .headers()
+        .get(ACCEPT)
+        .and_then(|value| value.to_str().ok())
+        .map_or(false, |accept| accept.contains("text/event-stream"));
+
+    // Batches are streamed back as SSE so the client can act on each response
+    // as soon as it is produced instead of waiting for the whole batch.
+    if is_batch && accepts_sse {
+        let messages = match MessageParser::parse_batch(&body) {
+            Ok(batch) => batch.messages,
+            Err(e) => {
+                error!("Failed to parse MCP HTTP batch: {}", e);
+                return parse_error_response(&e);
+            }
+        };
+
+        let mut response = HttpResponse::Ok();
+        response
+            .insert_header(("Content-Type", "text/event-stream"))
+            .insert_header((CACHE_CONTROL, "no-cache"));
+        if let Some(session_id) = &session_id {
+            response.insert_header((MCP_SESSION_HEADER, session_id.as_str()));
+        }
+
+        let (tx, rx) = mpsc::channel(messages.len());
+        let mcp_server = data.mcp_server.clone();
+        actix_web::rt::spawn(async move {
+            let mut session_id = session_id;
+            for message in messages {
+                let message = match message {
+                    Ok(message) => message,
+                    // Invalid element: its error response goes out in its place
+                    Err(error_response) => {
+                        if !send_event(&tx, &error_response).await {
+                            return;
+                        }
+                        continue;
+                    }
+                };
+
+                let response = match mcp_server.dispatch_message(message, &mut session_id).await {
+                    Ok(Some(response)) => response,
+                    Ok(None) => continue,
+                    // Requests are always answered, so only a notification can fail here
+                    Err(e) => {
+                        error!("Failed to handle MCP HTTP notification: {}", e);
+                        continue;
+                    }
+                };
+
+                if !send_event(&tx, &response).await {
+                    return;
+                }
+            }
+        });
+
+        return response.streaming(
+            ReceiverStream::new(rx).map(|item| Ok::<Bytes, actix_web::Error>(Bytes::from(item))),
+        );
+    }
+
+    let responses = match data.mcp_server.handle_http_message(&body, &mut session_id).await {
+        Ok(responses) => responses,
+        Err(e) => {
+            error!("Failed to handle MCP HTTP request: {}", e);
+            return parse_error_response(&e);
+        }
+    };
+
+    // Notifications only: nothing to answer
+    let mut response = if responses.is_empty() {
+        HttpResponse::Accepted()
+    } else {
+        HttpResponse::Ok()
+    };
+    if let Some(session_id) = &session_id {
+        response.insert_header((MCP_SESSION_HEADER, session_id.as_str()));
+    }
+
+    if responses.is_empty() {
+        response.finish()
+    } else if is_batch {
+        response.json(responses)
+    } else {
+        response.json(&responses[0])
+    }
+}
+
+// Handler ending the session named by the Mcp-Session-Id header
+pub async fn mcp_delete_handler(req: HttpRequest, data: web::Data<MCPAppState>) -> impl Responder {
+    if let Err(response) = check_request_origin(&req) {
+        return response;
+    }
+
+    let session_id = match req.headers().get(MCP_SESSION_HEADER).and_then(|value| value.to_str().ok()) {
+        Some(session_id) => session_id,
+        None => return HttpResponse::BadRequest().body("Missing Mcp-Session-Id header"),
+    };
+
+    match data.mcp_server.terminate_session(session_id).await {
+        Ok(()) => HttpResponse::NoContent().finish(),
+        Err(e) => {
+            warn!("Failed to terminate MCP session {}: {}", session_id, e);
+            HttpResponse::NotFound().body(e.to_string())
+        }
+    }
+}
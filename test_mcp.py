@@ -3,74 +3,34 @@
 Test script for Forge MCP Server
 """
 import json
-import subprocess
-import sys
-import time
 
-def test_mcp_server():
-    # Start the MCP server process
-    process = subprocess.Popen(
-        ['./target/debug/forge', '--mcp'],
-        stdin=subprocess.PIPE,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-        bufsize=0
-    )
-    
+from mcp_client import MCPClient, RequestTemplate
+
+INITIALIZE_REQUEST = RequestTemplate("initialize", {
+    "protocolVersion": "2024-11-05",
+    "capabilities": {},
+    "clientInfo": {
+        "name": "test-client",
+        "version": "1.0.0"
+    }
+})
+TOOLS_LIST_REQUEST = RequestTemplate("tools/list")
+
+def test_mcp_server(mcp_client):
     try:
         # Test 1: Initialize request
-        init_request = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "initialize",
-            "params": {
-                "protocolVersion": "2024-11-05",
-                "capabilities": {},
-                "clientInfo": {
-                    "name": "test-client",
-                    "version": "1.0.0"
-                }
-            }
-        }
-        
         print("Sending initialize request...")
-        process.stdin.write(json.dumps(init_request) + '\n')
-        process.stdin.flush()
-        
-        # Read response
-        response_line = process.stdout.readline()
-        if response_line:
-            response = json.loads(response_line.strip())
-            print(f"Initialize response: {json.dumps(response, indent=2)}")
-        else:
-            print("No response received")
-            
+        response = mcp_client.call(INITIALIZE_REQUEST)
+        print(f"Initialize response: {json.dumps(response, indent=2)}")
+
         # Test 2: List tools request
-        tools_request = {
-            "jsonrpc": "2.0",
-            "id": 2,
-            "method": "tools/list",
-            "params": {}
-        }
-        
         print("\nSending tools/list request...")
-        process.stdin.write(json.dumps(tools_request) + '\n')
-        process.stdin.flush()
-        
-        # Read response
-        response_line = process.stdout.readline()
-        if response_line:
-            response = json.loads(response_line.strip())
-            print(f"Tools list response: {json.dumps(response, indent=2)}")
-        else:
-            print("No response received")
-            
+        response = mcp_client.call(TOOLS_LIST_REQUEST)
+        print(f"Tools list response: {json.dumps(response, indent=2)}")
+
     except Exception as e:
         print(f"Error: {e}")
-    finally:
-        process.terminate()
-        process.wait()
 
 if __name__ == "__main__":
-    test_mcp_server()
\ No newline at end of file
+    with MCPClient.spawn() as client:
+        test_mcp_server(client)
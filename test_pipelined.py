@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Pipelined MCP test: independent requests in flight together on one connection
+"""
+import asyncio
+
+from mcp_client import AsyncMCPClient, loads
+
+async def run_pipelined(connect):
+    async with await connect() as client:
+        response = await client.call("initialize", {
+            "protocolVersion": "2024-11-05",
+            "capabilities": {},
+            "clientInfo": {
+                "name": "pipelined-test-client",
+                "version": "1.0.0"
+            }
+        })
+        print("✓ Initialize:", "OK" if "result" in response else f"ERROR: {response}")
+
+        # Everything below is independent, so send it all before awaiting any response
+        tools_response, directory_response, read_response, blocks_response = await asyncio.gather(
+            client.call("tools/list"),
+            client.call("tools/call", {
+                "name": "list_directory",
+                "arguments": {"path": ".", "max_depth": 1}
+            }),
+            client.call("tools/call", {
+                "name": "read_file",
+                "arguments": {"path": "Cargo.toml", "max_size": 1000}
+            }),
+            client.call("tools/call", {
+                "name": "list_blocks",
+                "arguments": {}
+            }),
+        )
+
+        if "result" in tools_response:
+            print(f"✓ Listed {len(tools_response['result']['tools'])} tools")
+        else:
+            print(f"✗ Tools list failed: {tools_response}")
+
+        if "result" in directory_response:
+            print(f"✓ Directory contents: {len(directory_response['result'].get('files', []))} items")
+        else:
+            print(f"✗ list_directory failed: {directory_response}")
+
+        if "result" in read_response:
+            print(f"✓ Read {len(read_response['result'].get('content', ''))} characters")
+        else:
+            print(f"✗ read_file failed: {read_response}")
+
+        if "result" in blocks_response:
+            try:
+                blocks = loads(blocks_response['result']['content'][0]['text'])
+                print(f"✓ Found {len(blocks)} blocks")
+            except (ValueError, KeyError, IndexError):
+                print("✓ Block list retrieved successfully")
+        else:
+            print(f"✗ list_blocks failed: {blocks_response}")
+
+def test_pipelined(mcp_async_connect):
+    asyncio.run(run_pipelined(mcp_async_connect))
+
+if __name__ == "__main__":
+    asyncio.run(run_pipelined(AsyncMCPClient.spawn))